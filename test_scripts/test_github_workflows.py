@@ -1,79 +1,154 @@
+import asyncio
+import concurrent.futures
 import subprocess
 import re
 import os
+import functools
+import threading
 import pytest
 import logging
 from wait_on_action import wait_on_action
-from github import Github
 
+# Patterns for the key=value lines emitted by the bash scripts; bytes
+# patterns so script output is scanned without decoding every line
+_COMMIT_RE = re.compile(rb"COMMIT_SHA=([a-f0-9]+)")
+_TEST_ID_RE = re.compile(rb"TEST_RUN_ID=([a-f0-9\-]+)")
 
+# Extracts owner/name from SSH (git@github.com:owner/name.git) and
+# HTTPS (https://github.com/owner/name) remote URLs
+_REMOTE_URL_RE = re.compile(r"github\.com[:/]([^/\s]+/[^/\s]+?)(?:\.git)?/?$")
+
+
+@functools.lru_cache(maxsize=1)
 def get_github_info():
     """
     Get GitHub authentication token and repository path.
-    
+
+    The token is read from GH_TOKEN/GITHUB_TOKEN (always set in CI) and the
+    repository path is parsed from the origin remote URL; the gh CLI is only
+    forked as a fallback when neither source works. These values never
+    change within a test session, so the result is cached.
+
     Returns:
         tuple: (github_token, repo_path) - GitHub token and repository path in format 'owner/name'
     """
-    github_token = subprocess.run(["gh", "auth", "token"], capture_output=True, text=True).stdout.strip()
-    repo_path = subprocess.run(
-        ["gh", "repo", "view", "--json", "owner,name", "--jq", ".owner.login + \"/\" + .name"],
-        capture_output=True, 
+    github_token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+    if not github_token:
+        github_token = subprocess.run(
+            ["gh", "auth", "token"], capture_output=True, text=True
+        ).stdout.strip()
+
+    remote_url = subprocess.run(
+        ["git", "config", "--get", "remote.origin.url"],
+        capture_output=True,
         text=True
     ).stdout.strip()
-    
+    remote_match = _REMOTE_URL_RE.search(remote_url)
+    if remote_match:
+        repo_path = remote_match.group(1)
+    else:
+        repo_path = subprocess.run(
+            ["gh", "repo", "view", "--json", "owner,name", "--jq", ".owner.login + \"/\" + .name"],
+            capture_output=True,
+            text=True
+        ).stdout.strip()
+
     return github_token, repo_path
 
 
-def run_bash_script(script_name):
+def run_script_and_wait(script_name, script_done=None, **wait_kwargs):
     """
-    Run a bash script from the test_scripts directory and validate its execution.
-    
+    Run a bash script and validate the workflow run it triggers.
+
+    The script's stdout is read line by line, and wait_on_action is started
+    in a background thread as soon as the COMMIT_SHA line appears, so
+    workflow polling overlaps the remainder of the script (tag pushes,
+    release creation) instead of waiting for it to exit.
+
     Args:
-        script_name (str): Name of the script file to execute
-        
+        script_name (str): Name of the script file in test_scripts to execute
+        script_done (threading.Event, optional): Set once the script has
+            exited, letting callers sequence work on the script without
+            waiting for the workflow verification
+        **wait_kwargs: Arguments forwarded to wait_on_action (commit_sha and
+            test_id are filled in from the script output)
+
     Returns:
-        str: Standard output from the script
-        
+        int: Exit code from wait_on_action
+
     Raises:
-        AssertionError: If the script execution fails
+        AssertionError: If the script fails or emits no commit SHA
     """
     TEST_SCRIPT_DIR = "test_scripts"
 
     script_path = os.path.join(TEST_SCRIPT_DIR, script_name)
-    result = subprocess.run([script_path], capture_output=True, text=True)
-    
-    # Ensure the script executed successfully
-    assert result.returncode == 0, f"Script failed with error: {result.stderr}"
-    
-    return result.stdout
 
+    wait_thread = None
+    wait_result = {}
+    output_lines = []
+    test_id = None
+
+    # Everything that can fail, Popen included, sits inside this try so
+    # script_done is always set and callers blocked on it never hang
+    try:
+        # Keep the pipes in bytes mode; the two key=value lines are matched
+        # with bytes patterns, so lines are never run through a text decoder.
+        # stderr is merged into the streamed stdout so a chatty script
+        # (git/gh write progress there) can never fill an undrained pipe
+        # and deadlock the read loop.
+        process = subprocess.Popen(
+            [script_path], stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+
+        for line in process.stdout:
+            output_lines.append(line)
+            logging.debug("[%s] %s", script_name, os.fsdecode(line).rstrip())
+
+            if test_id is None:
+                test_id_match = _TEST_ID_RE.search(line)
+                if test_id_match:
+                    test_id = os.fsdecode(test_id_match.group(1))
+
+            if wait_thread is None:
+                commit_match = _COMMIT_RE.search(line)
+                if commit_match:
+                    commit_sha = os.fsdecode(commit_match.group(1))
+                    if test_id is None:
+                        logging.warning(
+                            "TEST_RUN_ID not seen before COMMIT_SHA, proceeding without it"
+                        )
+
+                    # Start polling while the script finishes its teardown
+                    def watch(commit_sha=commit_sha, test_id=test_id):
+                        try:
+                            wait_result["exit_code"] = asyncio.run(wait_on_action(
+                                commit_sha=commit_sha, test_id=test_id, **wait_kwargs
+                            ))
+                        except Exception as e:
+                            wait_result["error"] = e
+
+                    wait_thread = threading.Thread(target=watch)
+                    wait_thread.start()
+
+        process.wait()
+    finally:
+        if script_done is not None:
+            script_done.set()
+
+    # Collect the watcher before asserting so a failed script never leaves
+    # a poller running behind an already-failed test
+    if wait_thread is not None:
+        wait_thread.join()
 
-def extract_run_info(script_output):
-    """
-    Extract commit SHA and test run ID from script output.
-    
-    Args:
-        script_output (str): Output from the bash script containing COMMIT_SHA and TEST_RUN_ID
-        
-    Returns:
-        tuple: (commit_sha, test_id) - The extracted commit hash and test identifier
-        
-    Raises:
-        AssertionError: If either commit SHA or test ID cannot be extracted
-    """
-    commit_match = re.search(r"COMMIT_SHA=([a-f0-9]+)", script_output)
-    test_id_match = re.search(r"TEST_RUN_ID=([a-f0-9\-]+)", script_output)
-    
-    commit_sha = commit_match.group(1)
-    assert commit_match, "Could not extract commit SHA"
-
-    if test_id_match:
-        test_id = test_id_match.group(1)
-    else:
-        test_id = None
-        logging.warning("TEST_RUN_ID not found in script output, proceeding without it")
+    # Ensure the script executed successfully
+    assert process.returncode == 0, (
+        f"Script failed with output: {b''.join(output_lines).decode('utf-8', 'replace')}"
+    )
+    assert wait_thread is not None, "Could not extract commit SHA"
 
-    return commit_sha, test_id
+    if "error" in wait_result:
+        raise wait_result["error"]
+    return wait_result["exit_code"]
 
 
 def test_hello_world():
@@ -83,33 +158,24 @@ def test_hello_world():
 def test_direct_release():
     """
     Test direct release without RC tag.
-    
+
     This test verifies that:
     1. A direct release without RC tag is properly created
     2. The GitHub Actions workflow properly fails verification
     """
-    # Set up logging
-    logging.basicConfig(level=logging.INFO, format="%(message)s")
-    
     # Test setup
     workflow_name = "onrelease.yml"
-    
+
     # Get GitHub token and repo information
     github_token, repo_path = get_github_info()
 
-    # Run the bash script that handles git/GitHub CLI operations
-    script_output = run_bash_script("test_direct_release.sh")
-    
-    # Extract commit SHA and test ID
-    commit_sha, test_id = extract_run_info(script_output)
-    
-    # Call wait_on_action directly as a Python function
-    exit_code = wait_on_action(
+    # Run the bash script and validate the workflow it triggers; polling
+    # starts as soon as the script prints the commit SHA
+    exit_code = run_script_and_wait(
+        "test_direct_release.sh",
         github_token=github_token,
         repo_path=repo_path,
-        commit_sha=commit_sha,
         workflow_name=workflow_name,
-        test_id=test_id,
         expected_conclusion="failure",
         timeout=120,  # Allow more time for workflow to complete
         poll_interval=5,
@@ -117,77 +183,70 @@ def test_direct_release():
         error_message="Direct release should have failed verification",
         verbose=True
     )
-    
+
     # Assert that the wait_on_action call was successful
-    assert exit_code == 0, f"Workflow validation failed: {error_message}"
+    assert exit_code == 0, "Direct release should have failed verification"
 
 
 def test_rc_release_workflow():
     """
     Test RC and final release workflow verification
-    
+
     This test verifies:
     1. RC release should be skipped by the workflow
     2. Final release should successfully run the workflow
     """
-    # Set up logging
-    logging.basicConfig(level=logging.INFO, format="%(message)s")
-    
     # Test setup
     workflow_name = "onrelease.yml"
-    
+
     # Get GitHub token and repo information
     github_token, repo_path = get_github_info()
 
-    # Run the bash script for RC release
-    script_output = run_bash_script("test_rc_release.sh")
-    
-    # Log the entire output for debugging
-    logging.info(f"Script output: {script_output}")
-    
-    # Extract commit SHA and test ID
-    commit_sha, test_id = extract_run_info(script_output)
-    
-    # First verification: RC release should be SKIPPED
-    logging.info("Verifying RC release workflow (should be skipped)...")
-    rc_exit_code = wait_on_action(
-        github_token=github_token,
-        repo_path=repo_path,
-        commit_sha=commit_sha,
-        workflow_name=workflow_name,
-        test_id=test_id,
-        expected_conclusion="skipped",
-        timeout=60,
-        poll_interval=5,
-        success_message="RC release workflow skipped successfully",
-        error_message="RC release workflow should have been skipped",
-        verbose=True
-    )
-    
-    # Assert that the first verification passed
+    rc_script_done = threading.Event()
+
+    def run_and_verify_rc_release():
+        # First verification: RC release should be SKIPPED
+        logging.info("Verifying RC release workflow (should be skipped)...")
+        return run_script_and_wait(
+            "test_rc_release.sh",
+            script_done=rc_script_done,
+            github_token=github_token,
+            repo_path=repo_path,
+            workflow_name=workflow_name,
+            expected_conclusion="skipped",
+            timeout=60,
+            poll_interval=5,
+            success_message="RC release workflow skipped successfully",
+            error_message="RC release workflow should have been skipped",
+            verbose=True
+        )
+
+    def run_and_verify_final_release():
+        # Second verification: Final release should SUCCEED
+        logging.info("Verifying final release workflow (should succeed)...")
+        return run_script_and_wait(
+            "test_final_release.sh",
+            github_token=github_token,
+            repo_path=repo_path,
+            workflow_name=workflow_name,
+            expected_conclusion="success",
+            timeout=120,  # Allow more time for workflow to complete
+            poll_interval=5,
+            success_message="Final release workflow completed successfully",
+            error_message="Final release workflow should have succeeded",
+            verbose=True
+        )
+
+    # The final release tags the commit test_rc_release.sh pushes, so the
+    # second leg starts as soon as that script exits (not when its
+    # verification finishes) and the two verifications run concurrently.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        rc_future = executor.submit(run_and_verify_rc_release)
+        rc_script_done.wait()
+        final_future = executor.submit(run_and_verify_final_release)
+        rc_exit_code = rc_future.result()
+        final_exit_code = final_future.result()
+
+    # Assert that both verifications passed
     assert rc_exit_code == 0, "RC release workflow verification failed"
-
-    # Run the bash script for final release
-    script_output = run_bash_script("test_final_release.sh")
-    
-    # Extract commit SHA and test ID
-    commit_sha, test_id = extract_run_info(script_output)
-
-    # Second verification: Final release should SUCCEED
-    logging.info("Verifying final release workflow (should succeed)...")
-    final_exit_code = wait_on_action(
-        github_token=github_token,
-        repo_path=repo_path,
-        commit_sha=commit_sha,
-        workflow_name=workflow_name,
-        test_id=test_id,
-        expected_conclusion="success",
-        timeout=120,  # Allow more time for workflow to complete
-        poll_interval=5,
-        success_message="Final release workflow completed successfully",
-        error_message="Final release workflow should have succeeded",
-        verbose=True
-    )
-    
-    # Assert that the second verification passed
-    assert final_exit_code == 0, "Final release workflow verification failed"
\ No newline at end of file
+    assert final_exit_code == 0, "Final release workflow verification failed"
@@ -9,131 +9,191 @@ It can be used both as a command-line tool or imported into other Python scripts
 """
 
 import argparse
+import asyncio
 import sys
 import time
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 import logging
-from github import Github, GithubException, Auth
-from github.WorkflowRun import WorkflowRun
+import aiohttp
+
+import workflow_events
+
+GITHUB_API_ROOT = "https://api.github.com"
+
+
+# Configure logging once at import; setup_logging only adjusts the level
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(message)s"
+)
 
 
 def setup_logging(verbose: bool = False) -> None:
-    """Configure logging based on verbosity level."""
+    """Set the logging level based on verbosity."""
     level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        level=level,
-        format="%(message)s"
-    )
+    logging.getLogger().setLevel(level)
 
-def get_matching_workflow_runs(
-    github_token: str,
+def _api_headers(github_token: str) -> Dict[str, str]:
+    """Build the standard headers for GitHub REST API requests."""
+    return {
+        "Authorization": f"Bearer {github_token}",
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+
+
+async def get_matching_workflow_runs(
+    session: aiohttp.ClientSession,
     repo_path: str,
     workflow_name: str,
     commit_sha: str,
-    test_id: Optional[str] = None
-) -> List[WorkflowRun]:
+    test_id: Optional[str] = None,
+    etag: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
     Get all workflow runs matching the specified criteria.
-    
+
+    Queries the runs listing for the workflow directly over REST with a
+    server-side head_sha filter, so only runs for this commit are ever
+    transferred; results come back sorted by created_at (newest first).
+    Passing the ETag from the previous poll makes the request conditional:
+    when nothing changed GitHub answers 304 with an empty body (which does
+    not count against the primary rate limit) and no JSON is parsed.
+
     Args:
-        github_token: GitHub authentication token
+        session: Shared aiohttp session with auth headers set
         repo_path: Repository path in format "owner/repo"
-        workflow_name: Name or filename of the workflow
+        workflow_name: Filename (or numeric id) of the workflow
         commit_sha: Commit SHA to filter by
         test_id: Optional Test ID to search for in the display_title
-        
+        etag: Optional ETag from the previous poll of this listing
+
     Returns:
-        List of matching workflow runs sorted by creation time (newest first)
+        Tuple of (matching workflow run dicts newest first, ETag for the
+        next poll). A 304 response yields an empty list.
     """
     logging.debug(f"Looking for workflow runs in {repo_path} for commit {commit_sha}")
     if test_id:
         logging.debug(f"Also filtering by Test ID: {test_id}")
-    
+
+    url = f"{GITHUB_API_ROOT}/repos/{repo_path}/actions/workflows/{workflow_name}/runs"
+    params = {"head_sha": commit_sha, "per_page": 10}
+    headers = {"If-None-Match": etag} if etag else None
+
     try:
-        # Initialize GitHub client
-        g = Github(auth=Auth.Token(github_token))
-        repo = g.get_repo(repo_path)
-        
-        # Find workflow by name or filename
-        workflows = list(repo.get_workflows())
-        target_workflow = None
-        
-        for workflow in workflows:
-            if workflow.name == workflow_name or workflow.path.endswith(f"/{workflow_name}"):
-                target_workflow = workflow
-                break
-        
-        if not target_workflow:
-            logging.error(f"Workflow '{workflow_name}' not found")
-            return []
-            
-        # Get runs for this workflow
-        all_runs = list(target_workflow.get_runs())
-        
-        # Filter by commit SHA and optionally by test_id
+        async with session.get(url, params=params, headers=headers) as response:
+            if response.status == 304:
+                logging.debug("Run listing unchanged since last poll (304)")
+                return [], etag
+            response.raise_for_status()
+            etag = response.headers.get("ETag")
+            recent_runs = (await response.json())["workflow_runs"]
+
+        # Optionally filter by test_id. head_sha alone cannot distinguish
+        # the RC and final release runs (both releases point at the same
+        # commit), but each release title carries its own Test ID, which
+        # the API reflects in the run's display_title.
         if test_id:
-            matching_runs = []
-            for run in all_runs:
-                if run.head_sha == commit_sha:
-                    # Check if test_id is in the display_title
-                    display_title = getattr(run, "display_title", "") or ""
-                    run_name = getattr(run, "name", "") or ""
-                    
-                    if test_id in display_title or test_id in run_name:
-                        matching_runs.append(run)
+            matching_runs = [
+                run for run in recent_runs
+                if test_id in (run.get("display_title") or "")
+            ]
         else:
-            # Just filter by commit SHA if no test_id
-            matching_runs = [run for run in all_runs if run.head_sha == commit_sha]
-        
-        # Sort by created_at (newest first)
-        matching_runs.sort(key=lambda run: run.created_at, reverse=True)
-        
+            matching_runs = recent_runs
+
         if test_id and not matching_runs:
             logging.debug(f"No runs found with Test ID: {test_id}")
-                
-        return matching_runs
-    
-    except GithubException as e:
+
+        return matching_runs, etag
+
+    except aiohttp.ClientError as e:
         logging.error(f"GitHub API error: {e}")
-        return []
+        return [], etag
     except Exception as e:
         logging.error(f"Error getting workflow runs: {e}")
-        return []
+        return [], etag
 
 
-def watch_workflow_run(
-    github_token: str,
+async def watch_workflow_run(
+    session: aiohttp.ClientSession,
     repo_path: str,
+    workflow_name: str,
+    commit_sha: str,
     run_id: int,
-    poll_interval: int = 5
-) -> str:
+    timeout: float = 120.0,
+    max_poll_interval: float = 15.0,
+    etag: Optional[str] = None
+) -> Optional[str]:
     """
     Watch a workflow run until it completes and return its conclusion.
-    
+
+    Status is read from the same head_sha-filtered runs listing used to
+    discover the run, so one conditional request returns the status of
+    every run for the commit at once (and 304s with no payload while
+    nothing has changed) instead of re-fetching the full run object.
+    Callers must check the run is not already completed before watching:
+    with the discovery ETag seeded, an already-finished run means the
+    listing never changes again and every poll here answers 304.
+
+    Polling uses exponential backoff (1s, 2s, 4s, ...) capped at
+    max_poll_interval, so short workflows are detected quickly while long
+    ones don't hammer the API. Sleeping is done with asyncio.sleep so
+    multiple runs can be watched concurrently from one event loop.
+
     Args:
-        github_token: GitHub authentication token
+        session: Shared aiohttp session with auth headers set
         repo_path: Repository path in format "owner/repo"
+        workflow_name: Filename (or numeric id) of the workflow
+        commit_sha: Commit SHA the run belongs to
         run_id: ID of the workflow run to watch
-        poll_interval: Time in seconds between status checks
-        
+        timeout: Maximum time in seconds to wait for completion
+        max_poll_interval: Maximum time in seconds between status checks
+        etag: Optional ETag carried over from the discovery poll
+
     Returns:
-        The conclusion of the workflow (success, failure, skipped, etc.)
+        The conclusion of the workflow (success, failure, skipped, etc.),
+        or None if the run did not complete within the timeout
     """
-    g = Github(auth=Auth.Token(github_token))
-    repo = g.get_repo(repo_path)
-    
-    while True:
-        run = repo.get_workflow_run(run_id)
-        status = run.status
-        conclusion = run.conclusion
-        
-        logging.info(f"Run #{run_id} - Status: {status}")
-        
-        if status == "completed":
-            return conclusion or "unknown"
-            
-        time.sleep(poll_interval)
+    deadline = time.monotonic() + timeout
+
+    delay = 1.0
+    while time.monotonic() < deadline:
+        runs, etag = await get_matching_workflow_runs(
+            session, repo_path, workflow_name, commit_sha, etag=etag
+        )
+        run = next((r for r in runs if r["id"] == run_id), None)
+
+        if run is not None:
+            status = run["status"]
+
+            logging.info(f"Run #{run_id} - Status: {status}")
+
+            if status == "completed":
+                return run["conclusion"] or "unknown"
+
+        await asyncio.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+        delay = min(delay * 2, max_poll_interval)
+
+    logging.error(f"Run #{run_id} did not complete within {timeout:.0f} seconds")
+    return None
+
+
+# Conclusions GitHub can report for a completed workflow run
+WORKFLOW_CONCLUSIONS = (
+    "success", "failure", "skipped", "cancelled",
+    "startup_failure", "timed_out", "action_required", "neutral"
+)
+
+# expected conclusion -> (default success message, default error message),
+# precomputed since the conclusion set is fixed
+_DEFAULT_MESSAGES = {
+    conclusion: (
+        f"Test passed: Workflow completed with expected conclusion: {conclusion}",
+        f"Test failed: Workflow should have concluded with {conclusion}",
+    )
+    for conclusion in WORKFLOW_CONCLUSIONS
+}
 
 
 def validate_conclusion(
@@ -144,22 +204,27 @@ def validate_conclusion(
 ) -> int:
     """
     Validate if the actual conclusion matches the expected one.
-    
+
     Args:
         actual_conclusion: The actual conclusion of the workflow run
         expected_conclusion: The expected conclusion to check against
         success_message: Custom message to display on success
         error_message: Custom message to display on error
-        
+
     Returns:
         Exit code (0 for success, 1 for failure)
     """
+    default_success, default_error = _DEFAULT_MESSAGES.get(expected_conclusion) or (
+        f"Test passed: Workflow completed with expected conclusion: {expected_conclusion}",
+        f"Test failed: Workflow should have concluded with {expected_conclusion}",
+    )
+
     if not success_message:
-        success_message = f"Test passed: Workflow completed with expected conclusion: {expected_conclusion}"
-        
+        success_message = default_success
+
     if not error_message:
-        error_message = f"Test failed: Workflow should have concluded with {expected_conclusion}"
-    
+        error_message = default_error
+
     if actual_conclusion == expected_conclusion:
         logging.info(f"✅ {success_message}")
         return 0
@@ -168,7 +233,7 @@ def validate_conclusion(
         return 1
 
 
-def wait_on_action(
+async def wait_on_action(
     github_token: str,
     repo_path: str,
     commit_sha: str,
@@ -182,13 +247,17 @@ def wait_on_action(
     verbose: bool = False
 ) -> int:
     """
-    Main function to wait for and validate a workflow run.
-    
+    Main coroutine to wait for and validate a workflow run.
+
+    All waiting is done with asyncio.sleep, so several wait_on_action
+    calls can be gathered on one event loop to watch workflows
+    concurrently. Synchronous callers should wrap this in asyncio.run().
+
     Args:
         github_token: GitHub authentication token
         repo_path: Repository path in format "owner/repo"
         commit_sha: Commit SHA to monitor
-        workflow_name: Name or filename of the workflow
+        workflow_name: Filename (or numeric id) of the workflow
         expected_conclusion: Expected conclusion (success, failure, skipped, etc.)
         test_id: Optional Test ID to search for in the display_title
         timeout: Maximum time to wait in seconds
@@ -213,63 +282,108 @@ def wait_on_action(
         logging.debug(f"  Timeout: {timeout} seconds")
         logging.debug(f"  Poll Interval: {poll_interval} seconds")
     
-    # Initial delay before starting checks
-    time.sleep(poll_interval)
-    
     start_time = time.time()
     end_time = start_time + timeout
-    workflow_found = False
-    
-    logging.info(f"Waiting for workflow to start (up to {timeout} seconds)...")
-    
-    while time.time() < end_time and not workflow_found:
-        runs = get_matching_workflow_runs(
-            github_token, repo_path, workflow_name, commit_sha, test_id
+
+    # Prefer event-driven waiting when a webhook channel is configured:
+    # the listener wakes us the moment GitHub delivers the workflow_run
+    # completion event, with no polling traffic at all. The event wait is
+    # bounded to a grace window, and a missed delivery falls back to
+    # polling on whatever remains of the original timeout budget.
+    listener = workflow_events.get_listener()
+    if listener is not None:
+        grace = min(timeout / 2, 30)
+        logging.info(
+            f"Waiting up to {grace:.0f} seconds for a workflow completion event..."
         )
-        
-        if runs:
-            workflow_found = True
-            run = runs[0]  # Get the most recent run
-            run_id = run.id
-            
-            log_message = f"✅ Workflow triggered by commit {commit_sha}"
-            if test_id:
-                log_message += f" with Test ID {test_id}"
-            logging.info(log_message + "!")
-            
-            if verbose:
-                logging.debug("Workflow Details:")
-                logging.debug(f"  ID: {run.id}")
-                logging.debug(f"  Name: {run.name}")
-                if hasattr(run, "display_title"):
-                    logging.debug(f"  Display Title: {run.display_title}")
-                logging.debug(f"  Status: {run.status}")
-                logging.debug(f"  Created: {run.created_at}")
-            
-            # Watch the run until it completes
-            logging.info("Watching workflow run until completion:")
-            final_conclusion = watch_workflow_run(
-                github_token, repo_path, run_id, poll_interval
-            )
-            
-            logging.info(f"Workflow concluded with status: {final_conclusion}")
+        conclusion = await listener.wait_for_completion(
+            commit_sha, workflow_name, test_id, timeout=grace
+        )
+        if conclusion is not None:
+            logging.info(f"Workflow concluded with status: {conclusion}")
             logging.info(f"Expected status: {expected_conclusion}")
-            
-            # Validate the conclusion
             return validate_conclusion(
-                final_conclusion, 
+                conclusion,
                 expected_conclusion,
                 success_message,
                 error_message
             )
-        
-        else:
-            if verbose:
-                logging.debug(f"Checking for workflow runs... (attempt {int(time.time() - start_time) // poll_interval + 1})")
+        logging.warning(
+            "No webhook delivery received in time, falling back to polling"
+        )
+
+    # Brief initial delay for GitHub to index the push; the first real
+    # check happens almost immediately rather than a full poll_interval in
+    await asyncio.sleep(0.5)
+
+    workflow_found = False
+
+    logging.info(f"Waiting for workflow to start (up to {timeout} seconds)...")
+
+    # One session (connection pool + auth headers) shared by every poll
+    async with aiohttp.ClientSession(headers=_api_headers(github_token)) as session:
+        # ETag of the last run-listing response, for conditional polling
+        etag = None
+
+        while time.time() < end_time and not workflow_found:
+            runs, etag = await get_matching_workflow_runs(
+                session, repo_path, workflow_name, commit_sha, test_id, etag
+            )
+
+            if runs:
+                workflow_found = True
+                run = runs[0]  # Get the most recent run
+                run_id = run["id"]
+
+                log_message = f"✅ Workflow triggered by commit {commit_sha}"
+                if test_id:
+                    log_message += f" with Test ID {test_id}"
+                logging.info(log_message + "!")
+
+                if verbose:
+                    logging.debug("Workflow Details:")
+                    logging.debug(f"  ID: {run['id']}")
+                    logging.debug(f"  Name: {run['name']}")
+                    if run.get("display_title"):
+                        logging.debug(f"  Display Title: {run['display_title']}")
+                    logging.debug(f"  Status: {run['status']}")
+                    logging.debug(f"  Created: {run['created_at']}")
+
+                if run["status"] == "completed":
+                    # Discovery already saw the finished run; its payload
+                    # carries the conclusion, so there is nothing to watch
+                    # (and with the ETag seeded, watching would only 304)
+                    final_conclusion = run["conclusion"] or "unknown"
+                else:
+                    # Watch the run until it completes, bounded by what is
+                    # left of the overall timeout budget
+                    logging.info("Watching workflow run until completion:")
+                    final_conclusion = await watch_workflow_run(
+                        session, repo_path, workflow_name, commit_sha, run_id,
+                        timeout=max(end_time - time.time(), 1.0),
+                        etag=etag
+                    )
+                    if final_conclusion is None:
+                        return 1
+
+                logging.info(f"Workflow concluded with status: {final_conclusion}")
+                logging.info(f"Expected status: {expected_conclusion}")
+
+                # Validate the conclusion
+                return validate_conclusion(
+                    final_conclusion, 
+                    expected_conclusion,
+                    success_message,
+                    error_message
+                )
+
             else:
-                print(".", end="", flush=True)
-            
-            time.sleep(poll_interval)
+                if verbose:
+                    logging.debug(f"Checking for workflow runs... (attempt {int(time.time() - start_time) // poll_interval + 1})")
+                else:
+                    print(".", end="", flush=True)
+
+                await asyncio.sleep(poll_interval)
     
     # If we get here, no workflow was found
     error_msg = f"❌ Error: No workflow was triggered by commit {commit_sha}"
@@ -290,10 +404,9 @@ def main():
     parser.add_argument("--token", required=True, help="GitHub authentication token")
     parser.add_argument("--repo", required=True, help="Repository in format 'owner/repo'")
     parser.add_argument("--commit", required=True, help="Commit SHA to match for workflow runs")
-    parser.add_argument("--workflow", required=True, help="Name of the workflow to monitor")
-    parser.add_argument("--expected", required=True, 
-                        choices=["success", "failure", "skipped", "cancelled", 
-                                 "startup_failure", "timed_out", "action_required", "neutral"],
+    parser.add_argument("--workflow", required=True, help="Filename of the workflow to monitor (e.g. onrelease.yml)")
+    parser.add_argument("--expected", required=True,
+                        choices=WORKFLOW_CONCLUSIONS,
                         help="Expected conclusion")
     
     # Optional arguments
@@ -308,7 +421,7 @@ def main():
     
     args = parser.parse_args()
     
-    exit_code = wait_on_action(
+    exit_code = asyncio.run(wait_on_action(
         github_token=args.token,
         repo_path=args.repo,
         commit_sha=args.commit,
@@ -320,6 +433,6 @@ def main():
         success_message=args.message,
         error_message=args.error,
         verbose=args.verbose
-    )
-    
+    ))
+
     sys.exit(exit_code)
\ No newline at end of file
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+"""
+GitHub Actions Workflow Event Listener
+
+Receives workflow_run webhook events through a smee.io channel so tests can
+wake up when a workflow completes instead of polling the REST API. The test
+repository must have a webhook configured to deliver workflow_run events to
+the smee channel, and the channel URL must be exported as
+WORKFLOW_WEBHOOK_PROXY_URL. When the variable is unset the listener is
+disabled and callers fall back to polling.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import aiohttp
+
+# smee.io channel URL proxying workflow_run webhook deliveries, e.g.
+# https://smee.io/AbCdEfGh. Unset means event-driven waiting is disabled.
+WEBHOOK_PROXY_URL_VAR = "WORKFLOW_WEBHOOK_PROXY_URL"
+
+
+class WorkflowEventListener:
+    """
+    Listens to a smee.io channel for workflow_run completion events.
+
+    The channel is consumed on a dedicated daemon thread running its own
+    event loop, so the listener is independent of the short-lived loops
+    each wait_on_action call spins up with asyncio.run. Completed runs are
+    recorded by head SHA under a threading.Condition: a waiter that starts
+    after the event arrived still sees it, and waiters blocked on the
+    condition are woken as soon as a delivery lands.
+    """
+
+    def __init__(self, proxy_url: str):
+        self.proxy_url = proxy_url
+        # head_sha -> list of completed workflow_run payloads
+        self._completed: Dict[str, list] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start consuming events on the background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="workflow-event-listener", daemon=True
+        )
+        self._thread.start()
+        logging.debug(f"Listening for workflow events on {self.proxy_url}")
+
+    def _run(self) -> None:
+        """Thread target: drive the event stream on a private loop."""
+        asyncio.run(self._read_events())
+
+    async def wait_for_completion(
+        self,
+        commit_sha: str,
+        workflow_name: str,
+        test_id: Optional[str] = None,
+        timeout: float = 60
+    ) -> Optional[str]:
+        """
+        Wait for a completed workflow_run for the given commit.
+
+        The blocking wait runs in a worker thread via asyncio.to_thread, so
+        the caller's event loop stays free.
+
+        Args:
+            commit_sha: Head SHA the workflow run must match
+            workflow_name: Filename (or display name) of the workflow
+            test_id: Optional Test ID that must appear in the run title
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            The run's conclusion, or None if no matching event arrived
+            before the timeout (callers should fall back to polling).
+        """
+        return await asyncio.to_thread(
+            self._wait_for_completion_sync, commit_sha, workflow_name, test_id, timeout
+        )
+
+    def _wait_for_completion_sync(
+        self,
+        commit_sha: str,
+        workflow_name: str,
+        test_id: Optional[str],
+        timeout: float
+    ) -> Optional[str]:
+        """Block until a matching completion is recorded or timeout passes."""
+        deadline = time.monotonic() + timeout
+
+        with self._condition:
+            while True:
+                run = self._find_completed(commit_sha, workflow_name, test_id)
+                if run is not None:
+                    return run.get("conclusion") or "unknown"
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if self._thread is None or not self._thread.is_alive():
+                    # Stream died; no more deliveries are coming
+                    return None
+
+                # Wake at least once a second to notice a dead stream
+                self._condition.wait(timeout=min(remaining, 1.0))
+
+    def _find_completed(
+        self,
+        commit_sha: str,
+        workflow_name: str,
+        test_id: Optional[str]
+    ) -> Optional[dict]:
+        """
+        Return a recorded completed run matching SHA, workflow and test_id.
+
+        Must be called with the condition lock held.
+        """
+        for run in self._completed.get(commit_sha, []):
+            run_path = run.get("path") or ""
+            run_name = run.get("name") or ""
+            if run_name != workflow_name and not run_path.endswith(f"/{workflow_name}"):
+                continue
+            if test_id:
+                display_title = run.get("display_title") or ""
+                if test_id not in display_title:
+                    continue
+            return run
+        return None
+
+    async def _read_events(self) -> None:
+        """Consume the smee.io server-sent-event stream."""
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(
+                    self.proxy_url,
+                    headers={"Accept": "text/event-stream"},
+                    timeout=None
+                ) as response:
+                    data_lines = []
+                    async for raw_line in response.content:
+                        line = raw_line.decode("utf-8", "replace").rstrip("\r\n")
+                        if line.startswith("data:"):
+                            data_lines.append(line[len("data:"):].strip())
+                        elif not line and data_lines:
+                            self._handle_delivery("\n".join(data_lines))
+                            data_lines = []
+        except Exception as e:
+            logging.warning(f"Workflow event stream closed ({e}); falling back to polling")
+
+    def _handle_delivery(self, data: str) -> None:
+        """Record a webhook delivery if it is a completed workflow_run."""
+        try:
+            delivery = json.loads(data)
+        except json.JSONDecodeError:
+            return
+        if not isinstance(delivery, dict):
+            return
+
+        # smee wraps the webhook body; tolerate raw payloads too
+        payload = delivery.get("body", delivery)
+        if not isinstance(payload, dict) or payload.get("action") != "completed":
+            return
+
+        run = payload.get("workflow_run") or {}
+        head_sha = run.get("head_sha")
+        if not head_sha:
+            return
+
+        logging.debug(
+            f"Received completion event for {head_sha} "
+            f"(conclusion: {run.get('conclusion')})"
+        )
+        with self._condition:
+            self._completed.setdefault(head_sha, []).append(run)
+            self._condition.notify_all()
+
+
+_listener: Optional[WorkflowEventListener] = None
+_listener_lock = threading.Lock()
+
+
+def get_listener() -> Optional[WorkflowEventListener]:
+    """
+    Return the shared started listener, or None if no channel is configured.
+    """
+    global _listener
+    proxy_url = os.environ.get(WEBHOOK_PROXY_URL_VAR)
+    if not proxy_url:
+        return None
+    with _listener_lock:
+        if _listener is None:
+            _listener = WorkflowEventListener(proxy_url)
+            _listener.start()
+    return _listener